@@ -9,11 +9,20 @@ import {
   HtmlAstTransform, 
   RemoveElementsOperation,
   CollapseWhitespaceOperation,
+  findNodes,
   findElementsByTagName,
   findElementsByClassName,
-  getTextContent
+  getTextContent,
+  isElementNode,
+  ElementNode
 } from '../src/index.js';
 
+// Head elements the extractor reads metadata from
+const HEAD_METADATA_TAGS = new Set(['title', 'meta']);
+
+// Elements that start a new content section
+const HEADING_TAGS = new Set(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']);
+
 // Sample HTML from a hypothetical blog post page
 const webpageHtml = `
 <!DOCTYPE html>
@@ -129,12 +138,26 @@ async function main() {
     
     // Extract metadata from the head
     const head = findElementsByTagName(ast, 'head')[0];
-    const title = head ? getTextContent(findElementsByTagName(head, 'title')[0]) : '';
     
-    const metaTags = findElementsByTagName(head, 'meta');
-    const description = metaTags
-      .find(meta => meta.attributes.name === 'description')
-      ?.attributes.content || '';
+    // Collect <title> and <meta> in a single walk over the head
+    const headElements = head
+      ? findNodes(head, node => isElementNode(node) && HEAD_METADATA_TAGS.has(node.name)) as ElementNode[]
+      : [];
+    
+    // Pick out the first title and description in one pass, dispatching on tag name
+    let titleElement: ElementNode | undefined;
+    let descriptionElement: ElementNode | undefined;
+    
+    for (const element of headElements) {
+      if (element.name === 'title') {
+        titleElement = titleElement || element;
+      } else if (element.attributes.name === 'description') {
+        descriptionElement = descriptionElement || element;
+      }
+    }
+    
+    const title = titleElement ? getTextContent(titleElement) : '';
+    const description = descriptionElement?.attributes.content || '';
     
     console.log('Page Metadata:');
     console.log(`- Title: ${title}`);
@@ -172,7 +195,7 @@ async function main() {
       let currentSection = null;
       
       for (const child of cleanedContentAst.children || []) {
-        if (child.type === 'element' && child.name.match(/^h[1-6]$/)) {
+        if (child.type === 'element' && HEADING_TAGS.has(child.name)) {
           if (currentSection) {
             sections.push(currentSection);
           }
@@ -40,6 +40,21 @@ const userGeneratedHtml = `
 </div>
 `;
 
+// Domains to be considered "internal" (not requiring security attributes),
+// built once and shared by the link operations below
+const internalDomains = ['example.org', 'mysite.com'];
+const internalDomainSet = new Set(internalDomains);
+
+// Check whether an href points to an external http(s) site
+function isExternalHref(href) {
+  if (!/^https?:\/\//i.test(href)) {
+    return false;
+  }
+  
+  const url = URL.parse(href);
+  return url !== null && !internalDomainSet.has(url.hostname);
+}
+
 async function main() {
   // Create a new transformer
   const transformer = new HtmlAstTransform();
@@ -51,20 +66,11 @@ async function main() {
     unsafeElements: ['marquee', 'blink'],
     unsafeAttributes: ['data-unsafe']
   }));
-  transformer.addTransformation(new SecureExternalLinksOperation([
-    // Domains to be considered "internal" (not requiring security attributes)
-    'example.org', 'mysite.com'
-  ]));
+  transformer.addTransformation(new SecureExternalLinksOperation(internalDomains));
   
   // Add custom styling to external links
   transformer.addTransformation(new AddClassOperation('external-link', 
-    (node) => {
-      return node.name === 'a' && 
-             node.attributes.href && 
-             node.attributes.href.match(/^https?:\/\//i) &&
-             !node.attributes.href.includes('example.org') &&
-             !node.attributes.href.includes('mysite.com');
-    }
+    (node) => node.name === 'a' && !!node.attributes.href && isExternalHref(node.attributes.href)
   ));
   
   console.log('Original HTML:');
@@ -73,7 +79,8 @@ async function main() {
   
   try {
     // Process the HTML
-    const { ast } = await transformer.parse(userGeneratedHtml);
+    // collectMetrics makes the parser count nodes while it builds the AST
+    const { ast, meta } = await transformer.parse(userGeneratedHtml, { collectMetrics: true });
     const { ast: sanitizedAst } = await transformer.transform(ast);
     
     // Convert back to HTML
@@ -83,7 +90,7 @@ async function main() {
     console.log(sanitizedHtml);
     
     // Analyze what was removed
-    const originalNodeCount = countNodes(ast);
+    const originalNodeCount = meta.nodeCount ?? countNodes(ast);
     const sanitizedNodeCount = countNodes(sanitizedAst);
     
     console.log('\nSanitization Statistics:');
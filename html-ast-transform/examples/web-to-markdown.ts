@@ -101,6 +101,13 @@ const webpageHtml = `
 </html>
 `;
 
+// Main content candidates by priority (lower rank wins): specific IDs, then
+// semantic elements, then common class names, falling back to body
+const MAIN_CONTENT_ID_RANKS = new Map([['content', 0], ['main-content', 1], ['main', 2]]);
+const MAIN_CONTENT_TAG_RANKS = new Map([['main', 3], ['article', 4], ['body', 7]]);
+const MAIN_CONTENT_CLASS_RANKS: [string, number][] = [['content', 5], ['article', 6]];
+const UNRANKED = 8;
+
 class HtmlToMarkdownConverter {
   private transformer: HtmlAstTransform;
   private baseUrl: string;
@@ -147,53 +154,62 @@ class HtmlToMarkdownConverter {
    * @returns Main content element, or null if not found
    */
   private findMainContent(ast: AstNode): AstNode | null {
-    // Try to find elements that typically contain the main content
-    const selectors = [
-      // First check for specific IDs
-      (node: AstNode) => isElementNode(node) && (node as ElementNode).attributes.id === 'content',
-      (node: AstNode) => isElementNode(node) && (node as ElementNode).attributes.id === 'main-content',
-      (node: AstNode) => isElementNode(node) && (node as ElementNode).attributes.id === 'main',
-      
-      // Then check for semantic elements
-      (node: AstNode) => isElementNode(node) && (node as ElementNode).name === 'main',
-      (node: AstNode) => isElementNode(node) && (node as ElementNode).name === 'article',
+    // Walk the tree once in document order, keeping the first match of the
+    // highest-priority rank seen so far (lower rank wins)
+    let best: AstNode | null = null;
+    let bestRank = UNRANKED;
+    const stack: AstNode[] = [ast];
+    
+    while (stack.length > 0 && bestRank > 0) {
+      const node = stack.pop()!;
       
-      // Then check for common class names
-      (node: AstNode) => isElementNode(node) && (node as ElementNode).attributes.class?.includes('content'),
-      (node: AstNode) => isElementNode(node) && (node as ElementNode).attributes.class?.includes('article'),
+      if (isElementNode(node)) {
+        const rank = this.getMainContentRank(node);
+        
+        if (rank < bestRank) {
+          best = node;
+          bestRank = rank;
+        }
+      }
       
-      // Fallback to body
-      (node: AstNode) => isElementNode(node) && (node as ElementNode).name === 'body'
-    ];
-    
-    for (const selector of selectors) {
-      const element = this.findNode(ast, selector);
-      if (element) return element;
+      if (node.children) {
+        for (let i = node.children.length - 1; i >= 0; i--) {
+          stack.push(node.children[i]);
+        }
+      }
     }
     
-    return null;
+    return best;
   }
   
   /**
-   * Find a node in the AST that matches a predicate.
+   * Rank an element as a main content candidate.
    * 
-   * @param node Root node to search from
-   * @param predicate Function that returns true for matching nodes
-   * @returns Matching node, or null if not found
+   * @param element Element to rank
+   * @returns Rank of the element (lower is more likely), or UNRANKED
    */
-  private findNode(node: AstNode, predicate: (node: AstNode) => boolean): AstNode | null {
-    if (predicate(node)) {
-      return node;
+  private getMainContentRank(element: ElementNode): number {
+    const { id, class: className } = element.attributes;
+    
+    // Specific IDs outrank everything else
+    const idRank = id ? MAIN_CONTENT_ID_RANKS.get(id) : undefined;
+    if (idRank !== undefined) {
+      return idRank;
     }
     
-    if (node.children) {
-      for (const child of node.children) {
-        const found = this.findNode(child, predicate);
-        if (found) return found;
+    let rank = MAIN_CONTENT_TAG_RANKS.get(element.name) ?? UNRANKED;
+    
+    // Common class names outrank the body fallback
+    if (className) {
+      for (const [fragment, classRank] of MAIN_CONTENT_CLASS_RANKS) {
+        if (classRank < rank && className.includes(fragment)) {
+          rank = classRank;
+          break;
+        }
       }
     }
     
-    return null;
+    return rank;
   }
   
   /**
@@ -217,8 +233,9 @@ class HtmlToMarkdownConverter {
     
     let markdown = '';
     
-    // Handle different HTML elements
-    switch (name.toLowerCase()) {
+    // Handle different HTML elements; tag names in the AST are already
+    // lowercase, so the switch dispatches on them directly
+    switch (name) {
       case 'h1':
       case 'h2':
       case 'h3':
@@ -348,9 +365,10 @@ class HtmlToMarkdownConverter {
     let headers: string[] = [];
     let rows: string[][] = [];
     
-    // Find header and body elements
-    let theadElement = null;
-    let tbodyElement = null;
+    // Classify the table's children in a single pass
+    let theadElement: ElementNode | null = null;
+    let tbodyElement: ElementNode | null = null;
+    const directRows: ElementNode[] = [];
     
     for (const child of tableElement.children || []) {
       if (isElementNode(child)) {
@@ -358,6 +376,8 @@ class HtmlToMarkdownConverter {
           theadElement = child;
         } else if (child.name === 'tbody') {
           tbodyElement = child;
+        } else if (child.name === 'tr') {
+          directRows.push(child);
         }
       }
     }
@@ -366,11 +386,7 @@ class HtmlToMarkdownConverter {
     if (theadElement) {
       for (const child of theadElement.children || []) {
         if (isElementNode(child) && child.name === 'tr') {
-          for (const cell of child.children || []) {
-            if (isElementNode(cell) && (cell.name === 'th' || cell.name === 'td')) {
-              headers.push(this.getChildrenMarkdown(cell, 0).trim());
-            }
-          }
+          headers = this.getRowCells(child, true);
           break; // Just process the first row of headers
         }
       }
@@ -380,12 +396,7 @@ class HtmlToMarkdownConverter {
     if (tbodyElement) {
       for (const child of tbodyElement.children || []) {
         if (isElementNode(child) && child.name === 'tr') {
-          const row: string[] = [];
-          for (const cell of child.children || []) {
-            if (isElementNode(cell) && cell.name === 'td') {
-              row.push(this.getChildrenMarkdown(cell, 0).trim());
-            }
-          }
+          const row = this.getRowCells(child, false);
           if (row.length > 0) {
             rows.push(row);
           }
@@ -393,25 +404,16 @@ class HtmlToMarkdownConverter {
       }
     }
     
-    // If no thead/tbody, look for direct tr elements
+    // If no thead/tbody, use the direct tr elements collected above
     if (headers.length === 0 && rows.length === 0) {
-      let firstRow = true;
-      for (const child of tableElement.children || []) {
-        if (isElementNode(child) && child.name === 'tr') {
-          const row: string[] = [];
-          for (const cell of child.children || []) {
-            if (isElementNode(cell) && (cell.name === 'th' || cell.name === 'td')) {
-              row.push(this.getChildrenMarkdown(cell, 0).trim());
-            }
-          }
-          
-          if (row.length > 0) {
-            if (firstRow) {
-              headers = row;
-              firstRow = false;
-            } else {
-              rows.push(row);
-            }
+      for (const rowElement of directRows) {
+        const row = this.getRowCells(rowElement, true);
+        
+        if (row.length > 0) {
+          if (headers.length === 0) {
+            headers = row;
+          } else {
+            rows.push(row);
           }
         }
       }
@@ -439,6 +441,25 @@ class HtmlToMarkdownConverter {
     
     return markdown;
   }
+  
+  /**
+   * Get the Markdown text of each cell in a table row.
+   * 
+   * @param rowElement Table row element
+   * @param includeHeaderCells Whether th cells count as cells
+   * @returns Trimmed Markdown for each cell
+   */
+  private getRowCells(rowElement: ElementNode, includeHeaderCells: boolean): string[] {
+    const cells: string[] = [];
+    
+    for (const cell of rowElement.children || []) {
+      if (isElementNode(cell) && (cell.name === 'td' || (includeHeaderCells && cell.name === 'th'))) {
+        cells.push(this.getChildrenMarkdown(cell, 0).trim());
+      }
+    }
+    
+    return cells;
+  }
 }
 
 async function main() {
@@ -15,3 +15,6 @@ export * from './serializer/index.js';
 
 // Storage exports
 export * from './storage/index.js';
+
+// Utility exports
+export * from './utils/index.js';
@@ -2,6 +2,8 @@ import { JSDOM } from 'jsdom';
 import { performance } from 'node:perf_hooks';
 import { TextDecoder } from 'node:util';
 
+import { isVoidElement } from '../utils/ast-utils.js';
+
 import type {
   AstNode,
   DocumentNode,
@@ -15,6 +17,19 @@ import type {
   SourcePosition
 } from '../types/index.js';
 
+/**
+ * Matches any non-whitespace character; used to detect whitespace-only text.
+ */
+const NON_WHITESPACE = /\S/;
+
+/**
+ * DOM node type values, fixed by the DOM standard. Comparing against module
+ * constants avoids reading Node.ELEMENT_NODE etc. off every child.
+ */
+const ELEMENT_NODE = 1;
+const TEXT_NODE = 3;
+const COMMENT_NODE = 8;
+
 /**
  * HTML parser implementation using JSDOM.
  * Uses Node.js v22+ features for performance and text handling.
@@ -44,23 +59,31 @@ export class HtmlParser implements Parser {
       includeNodeLocations: options.includePositions === true
     };
     
-    const { window } = new JSDOM(html, jsdomOptions);
+    const dom = new JSDOM(html, jsdomOptions);
+    const { window } = dom;
     const { document } = window;
     
-    // Get node locations if requested
-    const nodeLocations = options.includePositions 
-      ? (window as any).document._nodeLocations 
+    // Node locations are read from the JSDOM instance, which throws unless
+    // it was created with includeNodeLocations
+    const locationSource = jsdomOptions.includeNodeLocations ? dom : null;
+    
+    // Element names whose subtrees are not converted
+    const skipElements = options.skipElements && options.skipElements.length > 0
+      ? new Set(options.skipElements.map(name => name.toLowerCase()))
       : null;
     
+    // Count nodes while building the AST instead of walking it again afterwards
+    const nodeCount = { value: 0 };
+    
     // Create DocumentNode from DOM
-    const ast = this.createDocumentNode(document, nodeLocations, options);
+    const ast = this.createDocumentNode(document, locationSource, options, skipElements, nodeCount);
     
     // Create metadata
     const meta: ParseResult['meta'] = {};
     
     if (options.collectMetrics) {
       meta.parseTime = performance.now() - startTime;
-      meta.nodeCount = this.countNodes(ast);
+      meta.nodeCount = nodeCount.value;
     }
     
     // Clean up JSDOM
@@ -73,14 +96,19 @@ export class HtmlParser implements Parser {
    * Create a DocumentNode from a DOM Document.
    * 
    * @param document DOM Document
-   * @param nodeLocations Node locations map (if available)
+   * @param locationSource JSDOM instance to read node locations from, or null
+   *   when positions are not collected
    * @param options Parsing options
+   * @param skipElements Lowercase element names to leave out (if any)
+   * @param nodeCount Counter for created nodes
    * @returns DocumentNode representing the document
    */
   private createDocumentNode(
     document: Document, 
-    nodeLocations: Map<Node, any> | null,
-    options: ParserOptions
+    locationSource: JSDOM | null,
+    options: ParserOptions,
+    skipElements: Set<string> | null,
+    nodeCount: { value: number }
   ): DocumentNode {
     const doctype = document.doctype ? {
       name: document.doctype.name,
@@ -93,13 +121,17 @@ export class HtmlParser implements Parser {
       children: [],
       doctype
     };
+    nodeCount.value++;
     
     if (document.documentElement) {
       const rootNode = this.createElementNode(
         document.documentElement, 
+        document.documentElement.tagName.toLowerCase(),
         documentNode, 
-        nodeLocations,
-        options
+        locationSource,
+        options,
+        skipElements,
+        nodeCount
       );
       documentNode.children = [rootNode];
     }
@@ -111,16 +143,23 @@ export class HtmlParser implements Parser {
    * Create an ElementNode from a DOM Element.
    * 
    * @param element DOM Element
+   * @param tagName Lowercase tag name of the element
    * @param parent Parent AstNode
-   * @param nodeLocations Node locations map (if available)
+   * @param locationSource JSDOM instance to read node locations from, or null
+   *   when positions are not collected
    * @param options Parsing options
+   * @param skipElements Lowercase element names to leave out (if any)
+   * @param nodeCount Counter for created nodes
    * @returns ElementNode representing the element
    */
   private createElementNode(
     element: Element, 
+    tagName: string,
     parent: AstNode, 
-    nodeLocations: Map<Node, any> | null,
-    options: ParserOptions
+    locationSource: JSDOM | null,
+    options: ParserOptions,
+    skipElements: Set<string> | null,
+    nodeCount: { value: number }
   ): ElementNode {
     const attributes: Record<string, string> = {};
     
@@ -131,49 +170,61 @@ export class HtmlParser implements Parser {
     
     const node: ElementNode = {
       type: 'element',
-      name: element.tagName.toLowerCase(),
+      name: tagName,
       attributes,
       children: [],
       parent,
-      selfClosing: this.isSelfClosingTag(element.tagName.toLowerCase())
+      selfClosing: isVoidElement(tagName)
     };
+    nodeCount.value++;
     
-    // Add source position if available
-    if (nodeLocations) {
-      const location = nodeLocations.get(element);
-      if (location) {
-        node.sourcePosition = this.convertLocation(location);
-      }
+    // Add source position if requested
+    if (locationSource) {
+      this.setSourcePosition(node, locationSource.nodeLocation(element));
     }
     
     // Process children
     for (const child of element.childNodes) {
-      if (child.nodeType === child.ELEMENT_NODE) {
+      const nodeType = child.nodeType;
+      
+      if (nodeType === ELEMENT_NODE) {
         const childElement = child as Element;
+        
+        // Lowercase once; the name serves both the skip check and the node
+        const childName = childElement.tagName.toLowerCase();
+        
+        // Drop skipped subtrees without converting them
+        if (skipElements && skipElements.has(childName)) {
+          continue;
+        }
+        
         const childNode = this.createElementNode(
           childElement, 
+          childName,
           node, 
-          nodeLocations,
-          options
+          locationSource,
+          options,
+          skipElements,
+          nodeCount
         );
         node.children.push(childNode);
-      } else if (child.nodeType === child.TEXT_NODE) {
+      } else if (nodeType === TEXT_NODE) {
         const text = child.textContent || '';
-        if (text.trim() || options.preserveWhitespace) {
-          const textNode = this.createTextNode(
-            text, 
-            node, 
-            nodeLocations ? nodeLocations.get(child) : null
-          );
+        if (options.preserveWhitespace || NON_WHITESPACE.test(text)) {
+          const textNode = this.createTextNode(text, node);
+          if (locationSource) {
+            this.setSourcePosition(textNode, locationSource.nodeLocation(child));
+          }
           node.children.push(textNode);
+          nodeCount.value++;
+        }
+      } else if (nodeType === COMMENT_NODE) {
+        const commentNode = this.createCommentNode(child.textContent || '', node);
+        if (locationSource) {
+          this.setSourcePosition(commentNode, locationSource.nodeLocation(child));
         }
-      } else if (child.nodeType === child.COMMENT_NODE) {
-        const commentNode = this.createCommentNode(
-          child.textContent || '', 
-          node, 
-          nodeLocations ? nodeLocations.get(child) : null
-        );
         node.children.push(commentNode);
+        nodeCount.value++;
       }
     }
     
@@ -185,25 +236,14 @@ export class HtmlParser implements Parser {
    * 
    * @param text Text content
    * @param parent Parent AstNode
-   * @param location Node location (if available)
    * @returns TextNode representing the text
    */
-  private createTextNode(
-    text: string, 
-    parent: AstNode, 
-    location: any | null
-  ): TextNode {
-    const node: TextNode = {
+  private createTextNode(text: string, parent: AstNode): TextNode {
+    return {
       type: 'text',
       value: text,
       parent
     };
-    
-    if (location) {
-      node.sourcePosition = this.convertLocation(location);
-    }
-    
-    return node;
   }
   
   /**
@@ -211,25 +251,27 @@ export class HtmlParser implements Parser {
    * 
    * @param comment Comment content
    * @param parent Parent AstNode
-   * @param location Node location (if available)
    * @returns CommentNode representing the comment
    */
-  private createCommentNode(
-    comment: string, 
-    parent: AstNode, 
-    location: any | null
-  ): CommentNode {
-    const node: CommentNode = {
+  private createCommentNode(comment: string, parent: AstNode): CommentNode {
+    return {
       type: 'comment',
       value: comment,
       parent
     };
-    
-    if (location) {
-      node.sourcePosition = this.convertLocation(location);
-    }
-    
-    return node;
+  }
+  
+  /**
+   * Set a node's source position while positions are being collected.
+   * The field is set even when the location is unknown, so every node of a
+   * kind gains it in the same way and keeps a single shape.
+   * 
+   * @param node Node to update
+   * @param location Location from JSDOM's nodeLocation, or null/undefined if
+   *   the parser created the node without source text
+   */
+  private setSourcePosition(node: AstNode, location: any | null | undefined): void {
+    node.sourcePosition = location ? this.convertLocation(location) : undefined;
   }
   
   /**
@@ -246,35 +288,4 @@ export class HtmlParser implements Parser {
       endCol: location.endCol
     };
   }
-  
-  /**
-   * Check if a tag is self-closing.
-   * 
-   * @param tagName Tag name to check
-   * @returns True if the tag is self-closing, false otherwise
-   */
-  private isSelfClosingTag(tagName: string): boolean {
-    return [
-      'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
-      'link', 'meta', 'param', 'source', 'track', 'wbr'
-    ].includes(tagName);
-  }
-  
-  /**
-   * Count the number of nodes in an AST.
-   * 
-   * @param node Root node to count from
-   * @returns Number of nodes
-   */
-  private countNodes(node: AstNode): number {
-    let count = 1; // Count the current node
-    
-    if (node.children) {
-      for (const child of node.children) {
-        count += this.countNodes(child);
-      }
-    }
-    
-    return count;
-  }
 }
@@ -1,13 +1,11 @@
+import { isTextNode } from '../types/index.js';
+
 import type {
   AstNode,
   DocumentNode,
   ElementNode,
   TextNode,
-  CommentNode,
-  isElementNode,
-  isTextNode,
-  isCommentNode,
-  isDocumentNode
+  CommentNode
 } from '../types/index.js';
 
 /**
@@ -51,11 +49,49 @@ export interface SerializeOptions {
   encodeEntities?: boolean;
 }
 
+/**
+ * Default serialization options.
+ */
+const DEFAULT_SERIALIZE_OPTIONS: Readonly<Required<SerializeOptions>> = {
+  pretty: false,
+  indent: '  ',
+  xhtml: false,
+  minimizeEmptyAttributes: true,
+  xmlDeclaration: false,
+  encodeEntities: true
+};
+
+/**
+ * Elements whose content is serialized verbatim, without pretty-print layout.
+ */
+const PRESERVE_WHITESPACE_ELEMENTS = new Set(['pre', 'code']);
+
+/**
+ * Characters encoded by encodeHtmlEntities and their entity references.
+ */
+const HTML_ENTITIES: Record<string, string> = {
+  '&': '&amp;',
+  '<': '&lt;',
+  '>': '&gt;',
+  '"': '&quot;',
+  "'": '&#39;'
+};
+
+/**
+ * Matches every character that has an entry in HTML_ENTITIES.
+ */
+const HTML_SPECIAL_CHARS = /[&<>"']/g;
+
 /**
  * HTML serializer that converts an AST back to an HTML string.
  * Uses modern ES practices and is optimized for Node.js v22+.
  */
 export class HtmlSerializer {
+  /**
+   * Indentation strings by depth, per indent unit, shared across calls.
+   */
+  private indentCache = new Map<string, string[]>();
+  
   /**
    * Serialize an AST to an HTML string.
    * 
@@ -64,17 +100,8 @@ export class HtmlSerializer {
    * @returns HTML string
    */
   serialize(ast: AstNode, options: SerializeOptions = {}): string {
-    const defaultOptions: Required<SerializeOptions> = {
-      pretty: false,
-      indent: '  ',
-      xhtml: false,
-      minimizeEmptyAttributes: true,
-      xmlDeclaration: false,
-      encodeEntities: true
-    };
-    
     const mergedOptions: Required<SerializeOptions> = {
-      ...defaultOptions,
+      ...DEFAULT_SERIALIZE_OPTIONS,
       ...options
     };
     
@@ -94,18 +121,20 @@ export class HtmlSerializer {
     options: Required<SerializeOptions>,
     depth: number
   ): string {
-    if (isDocumentNode(node)) {
-      return this.serializeDocument(node, options, depth);
-    } else if (isElementNode(node)) {
-      return this.serializeElement(node, options, depth);
-    } else if (isTextNode(node)) {
-      return this.serializeText(node, options);
-    } else if (isCommentNode(node)) {
-      return this.serializeComment(node, options, depth);
+    // Dispatch once on the type tag, most frequent node types first
+    switch (node.type) {
+      case 'element':
+        return this.serializeElement(node as ElementNode, options, depth);
+      case 'text':
+        return this.serializeText(node as TextNode, options);
+      case 'comment':
+        return this.serializeComment(node as CommentNode, options, depth);
+      case 'document':
+        return this.serializeDocument(node as DocumentNode, options, depth);
+      default:
+        // Unknown node type, return empty string
+        return '';
     }
-    
-    // Unknown node type, return empty string
-    return '';
   }
   
   /**
@@ -175,45 +204,52 @@ export class HtmlSerializer {
     
     let html = indent + '<' + node.name;
     
-    // Add attributes
-    for (const [name, value] of Object.entries(node.attributes)) {
-      html += this.serializeAttribute(name, value, options);
+    // Add attributes (for...in avoids allocating an [name, value] pair per attribute)
+    const attributes = node.attributes;
+    for (const name in attributes) {
+      html += this.serializeAttribute(name, attributes[name], options);
     }
     
-    // Self-closing tag
-    if (node.selfClosing && (!node.children || node.children.length === 0)) {
-      html += options.xhtml ? ' />' : '>';
-      return html + newLine;
+    // Empty elements need no child layout analysis
+    if (!node.children || node.children.length === 0) {
+      if (node.selfClosing) {
+        html += options.xhtml ? ' />' : '>';
+        return html + newLine;
+      }
+      
+      return html + '></' + node.name + '>' + newLine;
     }
     
     html += '>';
     
     // Handle special case for <pre> elements (preserve whitespace)
-    const preserveWhitespace = node.name === 'pre' || node.name === 'code';
+    const preserveWhitespace = PRESERVE_WHITESPACE_ELEMENTS.has(node.name);
     
     // Add children
-    if (node.children && node.children.length > 0) {
-      const childDepth = depth + 1;
-      const hasNonTextChildren = node.children.some(child => !isTextNode(child));
-      
-      // Add newline after opening tag if we have non-text children and pretty printing is enabled
-      if (hasNonTextChildren && options.pretty && !preserveWhitespace) {
-        html += newLine;
-      }
-      
-      // Serialize children
-      for (const child of node.children) {
-        if (preserveWhitespace || !options.pretty || !hasNonTextChildren) {
-          html += this.serializeNode(child, { ...options, pretty: false }, childDepth);
-        } else {
-          html += this.serializeNode(child, options, childDepth);
-        }
-      }
-      
-      // Add indentation before closing tag if we have non-text children and pretty printing is enabled
-      if (hasNonTextChildren && options.pretty && !preserveWhitespace) {
-        html += indent;
-      }
+    const childDepth = depth + 1;
+    
+    // Only pretty printing lays children out differently, so compact output
+    // skips the per-child type scan
+    const hasNonTextChildren = options.pretty && node.children.some(child => !isTextNode(child));
+    
+    // Add newline after opening tag if we have non-text children and pretty printing is enabled
+    if (hasNonTextChildren && options.pretty && !preserveWhitespace) {
+      html += newLine;
+    }
+    
+    // Serialize children, choosing their layout once rather than per child
+    const inlineChildren = preserveWhitespace || !hasNonTextChildren;
+    const childOptions = options.pretty && inlineChildren
+      ? { ...options, pretty: false }
+      : options;
+    
+    for (const child of node.children) {
+      html += this.serializeNode(child, childOptions, childDepth);
+    }
+    
+    // Add indentation before closing tag if we have non-text children and pretty printing is enabled
+    if (hasNonTextChildren && options.pretty && !preserveWhitespace) {
+      html += indent;
     }
     
     // Closing tag
@@ -293,7 +329,19 @@ export class HtmlSerializer {
    * @returns Indentation string
    */
   private getIndent(indentChar: string, depth: number): string {
-    return indentChar.repeat(depth);
+    let indents = this.indentCache.get(indentChar);
+    
+    if (!indents) {
+      indents = [''];
+      this.indentCache.set(indentChar, indents);
+    }
+    
+    // Extend the cache one level at a time; each level reuses the previous one
+    while (indents.length <= depth) {
+      indents.push(indents[indents.length - 1] + indentChar);
+    }
+    
+    return indents[depth];
   }
   
   /**
@@ -303,11 +351,8 @@ export class HtmlSerializer {
    * @returns Encoded text
    */
   private encodeHtmlEntities(text: string): string {
-    return text
-      .replace(/&/g, '&amp;')
-      .replace(/</g, '&lt;')
-      .replace(/>/g, '&gt;')
-      .replace(/"/g, '&quot;')
-      .replace(/'/g, '&#39;');
+    // One scan replaces every special character via the lookup table, instead
+    // of one replace pass (and intermediate string) per character
+    return text.replace(HTML_SPECIAL_CHARS, char => HTML_ENTITIES[char]);
   }
 }
@@ -0,0 +1,68 @@
+import type { AstNode } from '../types/index.js';
+
+/**
+ * JSON replacer that drops parent references from AST nodes.
+ * Only `parent` keys holding a node are skipped, so attributes or metadata
+ * that happen to use the same name are kept.
+ */
+function skipParentReferences(key: string, value: unknown): unknown {
+  if (
+    key === 'parent' &&
+    value !== null &&
+    typeof value === 'object' &&
+    typeof (value as AstNode).type === 'string'
+  ) {
+    return undefined;
+  }
+  
+  return value;
+}
+
+/**
+ * Serialize an AST to JSON without copying it first.
+ * Parent references are skipped during encoding, so the circular structure
+ * never needs to be cloned and stripped.
+ * 
+ * @param ast Root node of the AST
+ * @returns JSON string
+ */
+export function serializeAst(ast: AstNode): string {
+  return JSON.stringify(ast, skipParentReferences);
+}
+
+/**
+ * Parse an AST serialized with serializeAst and restore its parent references.
+ * 
+ * @param json JSON string
+ * @returns Root node of the AST
+ */
+export function deserializeAst(json: string): AstNode {
+  const ast = JSON.parse(json) as AstNode;
+  restoreParentReferences(ast);
+  
+  return ast;
+}
+
+/**
+ * Restore parent references in an AST.
+ * Walks the tree with an explicit stack, so deep documents cannot overflow
+ * the call stack.
+ * 
+ * @param root Root node of the AST
+ */
+function restoreParentReferences(root: AstNode): void {
+  const stack: AstNode[] = [root];
+  
+  while (stack.length > 0) {
+    const node = stack.pop()!;
+    
+    // Process children
+    if (node.children) {
+      for (const child of node.children) {
+        // Set parent reference
+        child.parent = node;
+        stack.push(child);
+      }
+    }
+  }
+}
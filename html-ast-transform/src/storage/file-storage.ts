@@ -1,12 +1,19 @@
 import { Buffer } from 'node:buffer';
 import { mkdir, readdir, readFile, writeFile, rm, access } from 'node:fs/promises';
-import { join, resolve, dirname } from 'node:path';
+import { join, resolve } from 'node:path';
 import { constants } from 'node:fs';
 import { gzip, gunzip } from 'node:zlib';
 import { promisify } from 'node:util';
 
+import { deserializeAst, serializeAst } from './ast-json.js';
+
 import type { AstNode, AstStorage, StorageOptions } from '../types/index.js';
 
+/**
+ * Characters that are not allowed in file names on common file systems.
+ */
+const INVALID_FILE_NAME_CHARS = /[\\/:*?"<>|]/g;
+
 // Promisify zlib functions
 const gzipAsync = promisify(gzip);
 const gunzipAsync = promisify(gunzip);
@@ -18,6 +25,7 @@ const gunzipAsync = promisify(gunzip);
 export class FileStorage implements AstStorage {
   private basePath: string;
   private options: Required<StorageOptions>;
+  private directoryReady: Promise<void> | null = null;
   
   /**
    * Create a new file storage instance.
@@ -43,27 +51,29 @@ export class FileStorage implements AstStorage {
     // Ensure the directory exists
     await this.ensureDirectory();
     
-    // Clone the AST to avoid storing references
-    const clonedAst = structuredClone(ast);
-    
-    // Remove circular references (parent references)
-    this.removeParentReferences(clonedAst);
+    // Convert to JSON, skipping circular parent references
+    const jsonData = serializeAst(ast);
     
-    // Convert to JSON
-    const jsonData = JSON.stringify(clonedAst);
-    
-    // Determine the file path
+    // Determine the file path; sanitized IDs never contain path separators,
+    // so the file always lives directly in the base directory
     const filePath = this.getFilePath(id);
     
-    // Ensure the file's directory exists
-    await mkdir(dirname(filePath), { recursive: true });
-    
     // Compress if configured
-    if (this.options.compressed) {
-      const compressed = await gzipAsync(Buffer.from(jsonData, 'utf-8'));
-      await writeFile(filePath, compressed);
-    } else {
-      await writeFile(filePath, jsonData, 'utf-8');
+    const data = this.options.compressed
+      ? await gzipAsync(Buffer.from(jsonData, 'utf-8'))
+      : jsonData;
+    
+    try {
+      await writeFile(filePath, data);
+    } catch (error) {
+      if ((error as NodeJS.ErrnoException).code !== 'ENOENT') {
+        throw error;
+      }
+      
+      // The directory was removed after it was created; create it again
+      this.directoryReady = null;
+      await this.ensureDirectory();
+      await writeFile(filePath, data);
     }
   }
   
@@ -89,10 +99,7 @@ export class FileStorage implements AstStorage {
         : data.toString('utf-8');
       
       // Parse and restore parent references
-      const ast = JSON.parse(jsonData) as AstNode;
-      this.restoreParentReferences(ast);
-      
-      return ast;
+      return deserializeAst(jsonData);
     } catch (error) {
       // File doesn't exist or can't be read
       return null;
@@ -144,19 +151,18 @@ export class FileStorage implements AstStorage {
       await this.ensureDirectory();
       
       const files = await readdir(this.basePath, { recursive: true });
+      const extension = this.options.compressed ? '.json.gz' : '.json';
+      const ids: string[] = [];
       
-      return files
-        .filter(file => {
-          // Filter out non-JSON and non-compressed files
-          return (
-            (file.endsWith('.json') && !this.options.compressed) ||
-            (file.endsWith('.json.gz') && this.options.compressed)
-          );
-        })
-        .map(file => {
-          // Remove extension to get the ID
-          return file.replace(/\.json(\.gz)?$/, '');
-        });
+      for (const file of files) {
+        // Skip files written in the other storage format, then slice the
+        // known extension off to get the ID
+        if (file.endsWith(extension)) {
+          ids.push(file.slice(0, -extension.length));
+        }
+      }
+      
+      return ids;
     } catch (error) {
       return [];
     }
@@ -164,9 +170,21 @@ export class FileStorage implements AstStorage {
   
   /**
    * Ensure the base directory exists.
+   * The directory is created once per instance rather than on every call.
    */
-  private async ensureDirectory(): Promise<void> {
-    await mkdir(this.basePath, { recursive: true });
+  private ensureDirectory(): Promise<void> {
+    if (!this.directoryReady) {
+      this.directoryReady = mkdir(this.basePath, { recursive: true }).then(
+        () => undefined,
+        error => {
+          // Allow a later call to try again
+          this.directoryReady = null;
+          throw error;
+        }
+      );
+    }
+    
+    return this.directoryReady;
   }
   
   /**
@@ -177,7 +195,7 @@ export class FileStorage implements AstStorage {
    */
   private getFilePath(id: string): string {
     // Sanitize the ID for file system use
-    const sanitizedId = id.replace(/[\\/:*?"<>|]/g, '_');
+    const sanitizedId = id.replace(INVALID_FILE_NAME_CHARS, '_');
     
     // Add appropriate extension
     const fileName = this.options.compressed
@@ -186,41 +204,4 @@ export class FileStorage implements AstStorage {
     
     return join(this.basePath, fileName);
   }
-  
-  /**
-   * Remove parent references from an AST to avoid circular references.
-   * 
-   * @param node Root node of the AST
-   */
-  private removeParentReferences(node: AstNode): void {
-    // Remove parent reference
-    delete node.parent;
-    
-    // Process children
-    if (node.children) {
-      for (const child of node.children) {
-        this.removeParentReferences(child);
-      }
-    }
-  }
-  
-  /**
-   * Restore parent references in an AST.
-   * 
-   * @param node Root node of the AST
-   * @param parent Parent node (undefined for the root)
-   */
-  private restoreParentReferences(node: AstNode, parent?: AstNode): void {
-    // Set parent reference
-    if (parent) {
-      node.parent = parent;
-    }
-    
-    // Process children
-    if (node.children) {
-      for (const child of node.children) {
-        this.restoreParentReferences(child, node);
-      }
-    }
-  }
 }
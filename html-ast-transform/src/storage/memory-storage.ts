@@ -2,6 +2,8 @@ import { Buffer } from 'node:buffer';
 import { gzip, gunzip } from 'node:zlib';
 import { promisify } from 'node:util';
 
+import { deserializeAst, serializeAst } from './ast-json.js';
+
 import type { AstNode, AstStorage, StorageOptions } from '../types/index.js';
 
 // Promisify zlib functions
@@ -36,14 +38,8 @@ export class MemoryStorage implements AstStorage {
    * @param ast The AST to store
    */
   async store(id: string, ast: AstNode): Promise<void> {
-    // Clone the AST to avoid storing references
-    const clonedAst = structuredClone(ast);
-    
-    // Remove circular references (parent references)
-    this.removeParentReferences(clonedAst);
-    
-    // Convert to JSON
-    const jsonData = JSON.stringify(clonedAst);
+    // Convert to JSON, skipping circular parent references
+    const jsonData = serializeAst(ast);
     
     // Compress if configured
     if (this.options.compressed) {
@@ -74,10 +70,7 @@ export class MemoryStorage implements AstStorage {
         : data.toString('utf-8');
       
       // Parse and restore parent references
-      const ast = JSON.parse(jsonData) as AstNode;
-      this.restoreParentReferences(ast);
-      
-      return ast;
+      return deserializeAst(jsonData);
     } catch (error) {
       console.error('Error retrieving AST:', error);
       return null;
@@ -119,41 +112,4 @@ export class MemoryStorage implements AstStorage {
   async clear(): Promise<void> {
     this.storage.clear();
   }
-  
-  /**
-   * Remove parent references from an AST to avoid circular references.
-   * 
-   * @param node Root node of the AST
-   */
-  private removeParentReferences(node: AstNode): void {
-    // Remove parent reference
-    delete node.parent;
-    
-    // Process children
-    if (node.children) {
-      for (const child of node.children) {
-        this.removeParentReferences(child);
-      }
-    }
-  }
-  
-  /**
-   * Restore parent references in an AST.
-   * 
-   * @param node Root node of the AST
-   * @param parent Parent node (undefined for the root)
-   */
-  private restoreParentReferences(node: AstNode, parent?: AstNode): void {
-    // Set parent reference
-    if (parent) {
-      node.parent = parent;
-    }
-    
-    // Process children
-    if (node.children) {
-      for (const child of node.children) {
-        this.restoreParentReferences(child, node);
-      }
-    }
-  }
 }
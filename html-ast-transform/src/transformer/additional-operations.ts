@@ -1,12 +1,67 @@
-import type {
-  AstNode,
-  ElementNode,
-  TextNode,
-  TransformOperation,
-  TransformContext,
-  isElementNode,
-  isTextNode
-} from '../types/index.js';
+import { isElementNode, isTextNode } from '../types/index.js';
+import { getTextContent, hasClass } from '../utils/ast-utils.js';
+
+import type { AstNode, ElementNode } from '../types/index.js';
+import type { TransformOperation, TransformContext } from './ast-transformer.js';
+
+/**
+ * Attributes whose values are URLs and must be checked for unsafe schemes.
+ */
+const URL_ATTRIBUTES = new Set(['href', 'src', 'action']);
+
+/**
+ * URL schemes stripped from URL attributes by SanitizeHtmlOperation.
+ */
+const UNSAFE_URL_SCHEME = /^(?:javascript|data|vbscript):/i;
+
+/**
+ * Matches absolute http(s) URLs.
+ */
+const HTTP_URL = /^https?:\/\//i;
+
+/**
+ * Matches URLs that AbsoluteUrlsOperation leaves as they are.
+ */
+const NON_RELATIVE_URL = /^(?:https?:\/\/|data:|mailto:|tel:)/i;
+
+/**
+ * Heading ID slug patterns, applied in order by AddHeadingIdsOperation.
+ */
+const SLUG_INVALID_CHARS = /[^\w\s-]/g;
+const SLUG_SEPARATOR_RUNS = /[\s_-]+/g;
+const SLUG_EDGE_HYPHENS = /^-+|-+$/g;
+
+/**
+ * Elements removed by SanitizeHtmlOperation by default (lowercase).
+ */
+const DEFAULT_UNSAFE_ELEMENTS = [
+  'script', 'style', 'iframe', 'object', 'embed', 'applet', 'param', 'base',
+  'form', 'input', 'textarea', 'select', 'option', 'button', 'meta'
+];
+
+/**
+ * Attributes removed by SanitizeHtmlOperation by default (lowercase).
+ */
+const DEFAULT_UNSAFE_ATTRIBUTES = [
+  'onerror', 'onload', 'onclick', 'onmouseover', 'onmouseout', 'onmousedown',
+  'onmouseup', 'onkeydown', 'onkeypress', 'onkeyup', 'onchange', 'onsubmit',
+  'javascript:', 'data:', 'vbscript:'
+];
+
+/**
+ * Attributes rewritten by AbsoluteUrlsOperation by default.
+ */
+const DEFAULT_URL_ATTRIBUTES = ['href', 'src', 'action', 'data', 'poster'];
+
+/**
+ * Heading element names (lowercase).
+ */
+const HEADING_TAGS = new Set(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']);
+
+/**
+ * Maximum number of hrefs whose external/internal classification is cached.
+ */
+const EXTERNAL_LINK_CACHE_LIMIT = 1024;
 
 /**
  * Operation that sanitizes HTML by removing potentially unsafe elements and attributes.
@@ -27,24 +82,22 @@ export class SanitizeHtmlOperation implements TransformOperation {
     unsafeElements?: string[];
     unsafeAttributes?: string[];
   } = {}) {
-    // Default unsafe elements
-    this.unsafeElements = new Set([
-      'script', 'style', 'iframe', 'object', 'embed', 'applet', 'param', 'base',
-      'form', 'input', 'textarea', 'select', 'option', 'button', 'meta',
-      ...(options.unsafeElements || [])
-    ].map(tag => tag.toLowerCase()));
-    
-    // Default unsafe attributes
-    this.unsafeAttributes = new Set([
-      'onerror', 'onload', 'onclick', 'onmouseover', 'onmouseout', 'onmousedown',
-      'onmouseup', 'onkeydown', 'onkeypress', 'onkeyup', 'onchange', 'onsubmit',
-      'javascript:', 'data:', 'vbscript:',
-      ...(options.unsafeAttributes || [])
-    ]);
+    // Defaults are already lowercase; only user-provided names need normalizing
+    this.unsafeElements = new Set(DEFAULT_UNSAFE_ELEMENTS);
+    for (const tag of options.unsafeElements || []) {
+      this.unsafeElements.add(tag.toLowerCase());
+    }
+    
+    // Attribute names are matched in lowercase, so normalize them the same way
+    this.unsafeAttributes = new Set(DEFAULT_UNSAFE_ATTRIBUTES);
+    for (const attribute of options.unsafeAttributes || []) {
+      this.unsafeAttributes.add(attribute.toLowerCase());
+    }
   }
   
   shouldApply(node: AstNode): boolean {
-    return isElementNode(node) || isTextNode(node);
+    // Text nodes are always kept as is, so only elements need a transform call
+    return isElementNode(node);
   }
   
   transform(node: AstNode, _context: TransformContext): AstNode | null {
@@ -61,24 +114,21 @@ export class SanitizeHtmlOperation implements TransformOperation {
       // Clean attributes
       const newAttributes: Record<string, string> = {};
       
-      for (const [name, value] of Object.entries(elementNode.attributes)) {
+      const attributes = elementNode.attributes;
+      
+      for (const name in attributes) {
+        const value = attributes[name];
+        const lowerName = name.toLowerCase();
+        
         // Skip unsafe attributes
-        if (this.unsafeAttributes.has(name.toLowerCase())) {
+        if (this.unsafeAttributes.has(lowerName)) {
           continue;
         }
         
-        // Check for unsafe values in URLs
-        if (['href', 'src', 'action'].includes(name.toLowerCase())) {
-          const lowerValue = value.toLowerCase();
-          
-          // Skip attributes with unsafe URL schemes
-          if (
-            lowerValue.startsWith('javascript:') ||
-            lowerValue.startsWith('data:') ||
-            lowerValue.startsWith('vbscript:')
-          ) {
-            continue;
-          }
+        // Skip URL attributes with unsafe schemes (tested in place, without
+        // lowercasing a copy of what may be a very long data: URL)
+        if (URL_ATTRIBUTES.has(lowerName) && UNSAFE_URL_SCHEME.test(value)) {
+          continue;
         }
         
         // Keep safe attribute
@@ -108,6 +158,7 @@ export class SecureExternalLinksOperation implements TransformOperation {
   name = 'secureExternalLinks';
   
   private internalDomains: Set<string>;
+  private externalLinkCache: Map<string, boolean>;
   
   /**
    * Create a new secure external links operation.
@@ -116,42 +167,65 @@ export class SecureExternalLinksOperation implements TransformOperation {
    */
   constructor(internalDomains: string[] = []) {
     this.internalDomains = new Set(internalDomains);
+    this.externalLinkCache = new Map();
   }
   
   shouldApply(node: AstNode): boolean {
-    return isElementNode(node) && node.name.toLowerCase() === 'a' && 'href' in node.attributes;
+    return isElementNode(node) && node.name.toLowerCase() === 'a';
   }
   
   transform(node: AstNode, _context: TransformContext): AstNode | null {
     const anchorNode = node as ElementNode;
+    
+    // Single lookup: a missing href reads as undefined
     const href = anchorNode.attributes.href;
     
     // Skip links without href or with non-http schemes
-    if (!href || !href.match(/^https?:\/\//i)) {
+    if (!href || !HTTP_URL.test(href)) {
       return node;
     }
     
-    try {
-      const url = new URL(href);
-      const hostname = url.hostname;
+    // Check if the link is external
+    if (this.isExternal(href)) {
+      // Add secure attributes to external links
+      return {
+        ...anchorNode,
+        attributes: {
+          ...anchorNode.attributes,
+          target: '_blank',
+          rel: 'noopener noreferrer'
+        }
+      };
+    }
+    
+    return node;
+  }
+  
+  /**
+   * Check whether an absolute http(s) URL points outside the internal domains.
+   * Results are cached per href, since navigation and footer links repeat
+   * within a page and across pages.
+   * 
+   * @param href Absolute URL to check
+   * @returns True if the URL is external, false if internal or invalid
+   */
+  private isExternal(href: string): boolean {
+    let external = this.externalLinkCache.get(href);
+    
+    if (external === undefined) {
+      // URL.parse returns null instead of throwing for malformed hrefs,
+      // which are left unchanged
+      const url = URL.parse(href);
+      external = url !== null && !this.internalDomains.has(url.hostname);
       
-      // Check if the link is external
-      if (!this.internalDomains.has(hostname)) {
-        // Add secure attributes to external links
-        return {
-          ...anchorNode,
-          attributes: {
-            ...anchorNode.attributes,
-            target: '_blank',
-            rel: 'noopener noreferrer'
-          }
-        };
+      // Keep memory bounded when processing many documents
+      if (this.externalLinkCache.size >= EXTERNAL_LINK_CACHE_LIMIT) {
+        this.externalLinkCache.clear();
       }
-    } catch (error) {
-      // Invalid URL, return unchanged
+      this.externalLinkCache.set(href, external);
     }
     
-    return node;
+    return external;
   }
 }
 
@@ -163,6 +237,7 @@ export class AbsoluteUrlsOperation implements TransformOperation {
   name = 'absoluteUrls';
   
   private baseUrl: string;
+  private baseOrigin: string;
   private urlAttributes: Set<string>;
   
   /**
@@ -176,11 +251,14 @@ export class AbsoluteUrlsOperation implements TransformOperation {
   } = {}) {
     this.baseUrl = baseUrl.endsWith('/') ? baseUrl : `${baseUrl}/`;
     
-    // Default URL attributes
-    this.urlAttributes = new Set([
-      'href', 'src', 'action', 'data', 'poster',
-      ...(options.urlAttributes || [])
-    ]);
+    // Parse the base once; root-relative paths only need its origin
+    this.baseOrigin = new URL(this.baseUrl).origin;
+    
+    // Default URL attributes plus any user-provided ones
+    this.urlAttributes = new Set(DEFAULT_URL_ATTRIBUTES);
+    for (const attribute of options.urlAttributes || []) {
+      this.urlAttributes.add(attribute);
+    }
   }
   
   shouldApply(node: AstNode): boolean {
@@ -189,25 +267,31 @@ export class AbsoluteUrlsOperation implements TransformOperation {
   
   transform(node: AstNode, _context: TransformContext): AstNode | null {
     const elementNode = node as ElementNode;
-    const newAttributes: Record<string, string> = { ...elementNode.attributes };
-    let changed = false;
+    const attributes = elementNode.attributes;
+    
+    // Copied only once the first relative URL is found
+    let newAttributes: Record<string, string> | null = null;
     
-    for (const [name, value] of Object.entries(elementNode.attributes)) {
-      if (this.urlAttributes.has(name) && value && !value.match(/^(https?:\/\/|data:|mailto:|tel:)/i)) {
+    for (const name in attributes) {
+      const value = attributes[name];
+      
+      if (this.urlAttributes.has(name) && value && !NON_RELATIVE_URL.test(value)) {
+        if (!newAttributes) {
+          newAttributes = { ...attributes };
+        }
+        
         // Convert relative URL to absolute
         if (value.startsWith('/')) {
           // Absolute path
-          const baseUrlObj = new URL(this.baseUrl);
-          newAttributes[name] = `${baseUrlObj.origin}${value}`;
+          newAttributes[name] = `${this.baseOrigin}${value}`;
         } else {
           // Relative path
           newAttributes[name] = new URL(value, this.baseUrl).toString();
         }
-        changed = true;
       }
     }
     
-    if (changed) {
+    if (newAttributes) {
       return {
         ...elementNode,
         attributes: newAttributes
@@ -245,21 +329,20 @@ export class AddClassOperation implements TransformOperation {
   
   transform(node: AstNode, _context: TransformContext): AstNode | null {
     const elementNode = node as ElementNode;
-    const currentClasses = elementNode.attributes.class ? elementNode.attributes.class.split(/\s+/) : [];
     
     // Check if class already exists
-    if (currentClasses.includes(this.className)) {
+    if (hasClass(elementNode, this.className)) {
       return node;
     }
     
-    // Add the class
-    currentClasses.push(this.className);
+    // Append the class to the existing attribute value
+    const currentClass = elementNode.attributes.class;
     
     return {
       ...elementNode,
       attributes: {
         ...elementNode.attributes,
-        class: currentClasses.join(' ')
+        class: currentClass ? `${currentClass} ${this.className}` : this.className
       }
     };
   }
@@ -275,6 +358,7 @@ export class WrapElementsOperation implements TransformOperation {
   private wrapperTag: string;
   private wrapperAttributes: Record<string, string>;
   private selector: (node: ElementNode) => boolean;
+  private wrappers: WeakSet<AstNode>;
   
   /**
    * Create a new wrap elements operation.
@@ -291,6 +375,7 @@ export class WrapElementsOperation implements TransformOperation {
     this.wrapperTag = wrapperTag;
     this.selector = selector;
     this.wrapperAttributes = wrapperAttributes;
+    this.wrappers = new WeakSet();
   }
   
   shouldApply(node: AstNode): boolean {
@@ -298,7 +383,12 @@ export class WrapElementsOperation implements TransformOperation {
   }
   
   transform(node: AstNode, context: TransformContext): AstNode | null {
-    // Skip if already wrapped (parent has been processed)
+    // Skip nodes this operation has just wrapped (checked by identity)
+    if (node.parent && this.wrappers.has(node.parent)) {
+      return node;
+    }
+    
+    // Skip if already wrapped in the source (parent has been processed)
     if (
       context.path.length > 1 &&
       isElementNode(context.path[context.path.length - 2]) &&
@@ -307,19 +397,18 @@ export class WrapElementsOperation implements TransformOperation {
       return node;
     }
     
-    // Create wrapper element
+    // Create wrapper element; the node moves into it, so no copy is needed
     const wrapper: ElementNode = {
       type: 'element',
       name: this.wrapperTag.toLowerCase(),
       attributes: { ...this.wrapperAttributes },
-      children: [structuredClone(node)],
+      children: [node],
       selfClosing: false
     };
     
     // Update parent reference in the wrapped node
-    if (wrapper.children[0]) {
-      wrapper.children[0].parent = wrapper;
-    }
+    node.parent = wrapper;
+    this.wrappers.add(wrapper);
     
     return wrapper;
   }
@@ -328,6 +417,10 @@ export class WrapElementsOperation implements TransformOperation {
 /**
  * Operation that unwraps elements, replacing them with their children.
  * Useful for removing unnecessary container elements.
+ * 
+ * Unwrapping happens at the parent, which splices each selected child's
+ * content into its place, so the root node passed to the transformer is
+ * never unwrapped itself.
  */
 export class UnwrapElementsOperation implements TransformOperation {
   name = 'unwrapElements';
@@ -344,30 +437,78 @@ export class UnwrapElementsOperation implements TransformOperation {
   }
   
   shouldApply(node: AstNode): boolean {
-    return isElementNode(node) && this.selector(node as ElementNode);
+    // A transform returns a single node, so unwrapping is done by the parent,
+    // which can splice any number of children into an unwrapped child's place
+    return Boolean(node.children && node.children.length > 0);
   }
   
   transform(node: AstNode, _context: TransformContext): AstNode | null {
-    const elementNode = node as ElementNode;
+    const children = node.children;
     
-    // If no children, simply remove the element
-    if (!elementNode.children || elementNode.children.length === 0) {
-      return null;
+    // Nodes without children (text, comments) have nothing to unwrap
+    if (!children) {
+      return node;
     }
     
-    // Unwrap multiple children
-    if (elementNode.children.length > 1) {
-      // We can't directly return multiple nodes in the transform function
-      // Instead, we'll keep the first child and add its siblings to the parent
-      // after the current node in the transformer's traversal
+    // Copied only once the first child to unwrap is found
+    let newChildren: AstNode[] | null = null;
+    
+    for (let i = 0; i < children.length; i++) {
+      const child = children[i];
       
-      // Store in context for post-processing (would need to be implemented in transformer)
-      // For now, we'll just return the first child
-      return elementNode.children[0];
+      if (this.isUnwrapped(child)) {
+        if (!newChildren) {
+          newChildren = children.slice(0, i);
+        }
+        
+        this.appendUnwrapped(child, newChildren);
+      } else if (newChildren) {
+        newChildren.push(child);
+      }
+    }
+    
+    if (newChildren) {
+      return {
+        ...node,
+        children: newChildren
+      };
     }
     
-    // Unwrap single child
-    return elementNode.children[0];
+    return node;
+  }
+  
+  /**
+   * Check whether a node is an element selected for unwrapping.
+   * 
+   * @param node Node to check
+   * @returns True if the node should be replaced by its children
+   */
+  private isUnwrapped(node: AstNode): boolean {
+    return isElementNode(node) && this.selector(node as ElementNode);
+  }
+  
+  /**
+   * Append an unwrapped element's content in document order, also unwrapping
+   * any selected elements nested inside it.
+   * 
+   * @param element Element being unwrapped
+   * @param target Children array to append to
+   */
+  private appendUnwrapped(element: AstNode, target: AstNode[]): void {
+    const stack = [...(element.children || [])].reverse();
+    
+    while (stack.length > 0) {
+      const node = stack.pop()!;
+      
+      if (this.isUnwrapped(node)) {
+        // Push in reverse so the nested content keeps its order
+        for (let i = (node.children || []).length - 1; i >= 0; i--) {
+          stack.push(node.children![i]);
+        }
+      } else {
+        target.push(node);
+      }
+    }
   }
 }
 
@@ -380,6 +521,7 @@ export class AddHeadingIdsOperation implements TransformOperation {
   
   private prefix: string;
   private usedIds: Set<string>;
+  private nextSuffixes: Map<string, number>;
   
   /**
    * Create a new add heading IDs operation.
@@ -391,10 +533,11 @@ export class AddHeadingIdsOperation implements TransformOperation {
   } = {}) {
     this.prefix = options.prefix || 'heading-';
     this.usedIds = new Set();
+    this.nextSuffixes = new Map();
   }
   
   shouldApply(node: AstNode): boolean {
-    return isElementNode(node) && /^h[1-6]$/i.test(node.name);
+    return isElementNode(node) && HEADING_TAGS.has(node.name.toLowerCase());
   }
   
   transform(node: AstNode, _context: TransformContext): AstNode | null {
@@ -406,7 +549,7 @@ export class AddHeadingIdsOperation implements TransformOperation {
     }
     
     // Get heading text content
-    const textContent = this.getTextContent(headingNode);
+    const textContent = getTextContent(headingNode);
     
     // Generate ID from text content
     let id = this.generateId(textContent);
@@ -421,23 +564,6 @@ export class AddHeadingIdsOperation implements TransformOperation {
     };
   }
   
-  /**
-   * Get text content from a node and its descendants.
-   */
-  private getTextContent(node: AstNode): string {
-    if (isTextNode(node)) {
-      return node.value;
-    }
-    
-    if (!node.children) {
-      return '';
-    }
-    
-    return node.children
-      .map(child => this.getTextContent(child))
-      .join('');
-  }
-  
   /**
    * Generate an ID from text content.
    */
@@ -446,17 +572,22 @@ export class AddHeadingIdsOperation implements TransformOperation {
     let id = this.prefix + text
       .toLowerCase()
       .trim()
-      .replace(/[^\w\s-]/g, '')
-      .replace(/[\s_-]+/g, '-')
-      .replace(/^-+|-+$/g, '');
+      .replace(SLUG_INVALID_CHARS, '')
+      .replace(SLUG_SEPARATOR_RUNS, '-')
+      .replace(SLUG_EDGE_HYPHENS, '');
     
-    // Ensure ID is unique
+    // Ensure ID is unique, resuming from the last suffix tried for this base
     let uniqueId = id;
-    let counter = 1;
     
-    while (this.usedIds.has(uniqueId)) {
-      uniqueId = `${id}-${counter}`;
-      counter++;
+    if (this.usedIds.has(uniqueId)) {
+      let counter = this.nextSuffixes.get(id) ?? 1;
+      
+      do {
+        uniqueId = `${id}-${counter}`;
+        counter++;
+      } while (this.usedIds.has(uniqueId));
+      
+      this.nextSuffixes.set(id, counter);
     }
     
     // Store the ID
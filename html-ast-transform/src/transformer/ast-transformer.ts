@@ -1,16 +1,42 @@
 import { performance } from 'node:perf_hooks';
 
+import { isElementNode, isTextNode } from '../types/index.js';
+
 import type {
   AstNode,
   ElementNode,
   TextNode,
   Transformer,
   TransformerOptions,
-  TransformResult,
-  isElementNode,
-  isTextNode
+  TransformResult
 } from '../types/index.js';
 
+/**
+ * Matches text that is not already collapsed: leading or trailing whitespace,
+ * a run of whitespace, or any whitespace character other than a plain space.
+ */
+const UNCOLLAPSED_WHITESPACE = /^\s|\s$|\s\s|[^\S ]/;
+
+/**
+ * Matches runs of whitespace to collapse into a single space.
+ */
+const WHITESPACE_RUN = /\s+/g;
+
+/**
+ * Check whether an element has at least one attribute without building
+ * an array of its attribute names.
+ * 
+ * @param node Element to check
+ * @returns True if the element has any attributes, false otherwise
+ */
+function hasAttributes(node: ElementNode): boolean {
+  for (const _name in node.attributes) {
+    return true;
+  }
+  
+  return false;
+}
+
 /**
  * Interface for individual transformation operations.
  */
@@ -66,7 +92,9 @@ export class AstTransformer implements Transformer {
    * @param operations Transformation operations to apply
    */
   constructor(operations: TransformOperation[] = []) {
-    this.operations = structuredClone(operations);
+    // Copy the list only: operations are class instances with methods (and
+    // often function-valued fields), which structuredClone cannot keep
+    this.operations = [...operations];
   }
   
   /**
@@ -107,8 +135,11 @@ export class AstTransformer implements Transformer {
     // Track transformation metrics
     const transformedNodeCount = { value: 0 };
     
-    // Apply transformations
-    const transformedAst = this.transformNode(clonedAst, context, transformedNodeCount);
+    // Apply transformations; with no operations registered the walk could not
+    // change anything, so it is skipped
+    const transformedAst = this.operations.length > 0
+      ? this.transformNode(clonedAst, context, transformedNodeCount)
+      : clonedAst;
     
     // Create metadata
     const meta: TransformResult['meta'] = {};
@@ -170,8 +201,10 @@ export class AstTransformer implements Transformer {
     if (transformedNode && transformedNode.children) {
       const transformedChildren: AstNode[] = [];
       
+      // Children share the context: each call pushes and pops its own path
+      // entry, so the ancestor path is never copied per node
       for (const child of transformedNode.children) {
-        const transformedChild = this.transformNode(child, { ...context, path: [...context.path] }, transformedNodeCount);
+        const transformedChild = this.transformNode(child, context, transformedNodeCount);
         
         if (transformedChild !== null) {
           // Update parent reference
@@ -242,7 +275,14 @@ export class CollapseWhitespaceOperation implements TransformOperation {
   
   transform(node: AstNode, _context: TransformContext): AstNode | null {
     const textNode = node as TextNode;
-    const collapsedText = textNode.value.replace(/\s+/g, ' ').trim();
+    const value = textNode.value;
+    
+    // Text that is already collapsed is kept as is, without building a copy
+    if (value !== '' && !UNCOLLAPSED_WHITESPACE.test(value)) {
+      return node;
+    }
+    
+    const collapsedText = value.replace(WHITESPACE_RUN, ' ').trim();
     
     if (collapsedText === '') {
       return null;
@@ -272,7 +312,7 @@ export class RemoveAttributesOperation implements TransformOperation {
   }
   
   shouldApply(node: AstNode): boolean {
-    return isElementNode(node) && Object.keys(node.attributes).length > 0;
+    return isElementNode(node) && hasAttributes(node);
   }
   
   transform(node: AstNode, _context: TransformContext): AstNode | null {
@@ -288,12 +328,22 @@ export class RemoveAttributesOperation implements TransformOperation {
     }
     
     // Otherwise, remove only the specified attributes
-    for (const [name, value] of Object.entries(elementNode.attributes)) {
-      if (!this.attributeNames.has(name)) {
-        newAttributes[name] = value;
+    const attributes = elementNode.attributes;
+    let removed = false;
+    
+    for (const name in attributes) {
+      if (this.attributeNames.has(name)) {
+        removed = true;
+      } else {
+        newAttributes[name] = attributes[name];
       }
     }
     
+    // Leave elements without any of the attributes untouched
+    if (!removed) {
+      return node;
+    }
+    
     return {
       ...elementNode,
       attributes: newAttributes
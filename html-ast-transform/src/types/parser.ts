@@ -22,6 +22,14 @@ export interface ParserOptions {
    */
   includePositions?: boolean;
   
+  /**
+   * Element names (case-insensitive) whose entire subtrees are left out
+   * of the AST, e.g. ['script', 'style']. Skipped subtrees are never
+   * converted, which is cheaper than removing them in a transform pass.
+   * @default []
+   */
+  skipElements?: string[];
+  
   /**
    * Additional parser-specific options.
    */
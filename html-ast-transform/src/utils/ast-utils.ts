@@ -1,19 +1,28 @@
+import { isElementNode, isTextNode } from '../types/index.js';
 import type {
   AstNode,
   ElementNode,
   TextNode,
-  CommentNode,
-  DocumentNode,
-  isElementNode,
-  isTextNode,
-  isCommentNode,
-  isDocumentNode
+  CommentNode
 } from '../types/index.js';
 
 /**
  * Utility functions for working with AST nodes.
  */
 
+/**
+ * Matches a single whitespace character (class list separator).
+ */
+const WHITESPACE = /\s/;
+
+/**
+ * Void elements, which never have children or a closing tag.
+ */
+const VOID_ELEMENTS = new Set([
+  'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+  'link', 'meta', 'param', 'source', 'track', 'wbr'
+]);
+
 /**
  * Find all nodes in the AST that match a predicate function.
  * 
@@ -23,16 +32,21 @@ import type {
  */
 export function findNodes(node: AstNode, predicate: (node: AstNode) => boolean): AstNode[] {
   const results: AstNode[] = [];
+  const stack: AstNode[] = [node];
   
-  // Check if current node matches
-  if (predicate(node)) {
-    results.push(node);
-  }
-  
-  // Check children
-  if (node.children) {
-    for (const child of node.children) {
-      results.push(...findNodes(child, predicate));
+  // Depth-first in document order, collecting into a single array
+  while (stack.length > 0) {
+    const current = stack.pop()!;
+    
+    if (predicate(current)) {
+      results.push(current);
+    }
+    
+    const children = current.children;
+    if (children) {
+      for (let i = children.length - 1; i >= 0; i--) {
+        stack.push(children[i]);
+      }
     }
   }
   
@@ -62,12 +76,43 @@ export function findElementsByTagName(node: AstNode, tagName: string): ElementNo
  * @returns Array of matching element nodes
  */
 export function findElementsByClassName(node: AstNode, className: string): ElementNode[] {
-  return findNodes(node, (n) => {
-    if (!isElementNode(n)) return false;
+  return findNodes(node, (n) => isElementNode(n) && hasClass(n, className)) as ElementNode[];
+}
+
+/**
+ * Check whether an element's class attribute contains a class name.
+ * Scans the attribute in place instead of splitting it into a list.
+ * 
+ * @param node Element to check
+ * @param className Class name to look for (a single token; names containing
+ *   whitespace never match)
+ * @returns True if the class is present, false otherwise
+ */
+export function hasClass(node: ElementNode, className: string): boolean {
+  const classAttribute = node.attributes.class;
+  
+  // A class list token can never contain whitespace, so such a name cannot match
+  if (!classAttribute || !className || WHITESPACE.test(className)) {
+    return false;
+  }
+  
+  let index = classAttribute.indexOf(className);
+  
+  while (index !== -1) {
+    const end = index + className.length;
     
-    const classes = n.attributes.class ? n.attributes.class.split(/\s+/) : [];
-    return classes.includes(className);
-  }) as ElementNode[];
+    // Only a whole whitespace-delimited token counts as a match
+    if (
+      (index === 0 || WHITESPACE.test(classAttribute[index - 1])) &&
+      (end === classAttribute.length || WHITESPACE.test(classAttribute[end]))
+    ) {
+      return true;
+    }
+    
+    index = classAttribute.indexOf(className, index + 1);
+  }
+  
+  return false;
 }
 
 /**
@@ -102,8 +147,72 @@ export function findElementsByAttribute(
  * @returns Matching element node, or undefined if not found
  */
 export function getElementById(node: AstNode, id: string): ElementNode | undefined {
-  const results = findElementsByAttribute(node, 'id', id);
-  return results.length > 0 ? results[0] : undefined;
+  const stack: AstNode[] = [node];
+  
+  // Depth-first in document order, stopping at the first match
+  while (stack.length > 0) {
+    const current = stack.pop()!;
+    
+    if (isElementNode(current) && current.attributes.id === id) {
+      return current;
+    }
+    
+    const children = current.children;
+    if (children) {
+      for (let i = children.length - 1; i >= 0; i--) {
+        stack.push(children[i]);
+      }
+    }
+  }
+  
+  return undefined;
+}
+
+/**
+ * Index all elements with an ID attribute in a single walk.
+ * Use this instead of repeated getElementById calls when looking up many
+ * IDs in the same tree; each lookup is then a map access. Results match
+ * getElementById, including for duplicate and empty IDs.
+ * 
+ * @param node Root node to index
+ * @returns Map from ID to the first element (in document order) with that ID
+ */
+export function indexElementsById(node: AstNode): Map<string, ElementNode> {
+  const index = new Map<string, ElementNode>();
+  const stack: AstNode[] = [node];
+  
+  while (stack.length > 0) {
+    const current = stack.pop()!;
+    
+    if (isElementNode(current)) {
+      const id = current.attributes.id;
+      
+      // Keep the first occurrence, matching getElementById
+      if (id !== undefined && !index.has(id)) {
+        index.set(id, current);
+      }
+    }
+    
+    const children = current.children;
+    if (children) {
+      for (let i = children.length - 1; i >= 0; i--) {
+        stack.push(children[i]);
+      }
+    }
+  }
+  
+  return index;
+}
+
+/**
+ * Check whether a tag name is a void element, which never has children or a
+ * closing tag.
+ * 
+ * @param name Lowercase element tag name
+ * @returns True if the element is a void element, false otherwise
+ */
+export function isVoidElement(name: string): boolean {
+  return VOID_ELEMENTS.has(name);
 }
 
 /**
@@ -121,16 +230,15 @@ export function createElement(
   children: AstNode[] = [],
   parent?: AstNode
 ): ElementNode {
+  const tagName = name.toLowerCase();
+  
   const element: ElementNode = {
     type: 'element',
-    name: name.toLowerCase(),
+    name: tagName,
     attributes,
     children,
     parent,
-    selfClosing: [
-      'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
-      'link', 'meta', 'param', 'source', 'track', 'wbr'
-    ].includes(name.toLowerCase())
+    selfClosing: isVoidElement(tagName)
   };
   
   // Set parent reference in children
@@ -182,13 +290,27 @@ export function getTextContent(node: AstNode): string {
     return node.value;
   }
   
-  if (!node.children) {
-    return '';
+  const parts: string[] = [];
+  const stack: AstNode[] = [node];
+  
+  // Walk the subtree in document order without recursing
+  while (stack.length > 0) {
+    const current = stack.pop()!;
+    
+    if (isTextNode(current)) {
+      parts.push(current.value);
+      continue;
+    }
+    
+    const children = current.children;
+    if (children) {
+      for (let i = children.length - 1; i >= 0; i--) {
+        stack.push(children[i]);
+      }
+    }
   }
   
-  return node.children
-    .map(child => getTextContent(child))
-    .join('');
+  return parts.join('');
 }
 
 /**
@@ -199,6 +321,34 @@ export function getTextContent(node: AstNode): string {
  * @returns Cloned node
  */
 export function cloneNode(node: AstNode, parent?: AstNode): AstNode {
+  const clonedRoot = cloneNodeData(node, parent);
+  
+  // Pairs of [source node, its clone] whose children still need cloning
+  const stack: [AstNode, AstNode][] = [[node, clonedRoot]];
+  
+  while (stack.length > 0) {
+    const [source, clonedNode] = stack.pop()!;
+    
+    if (source.children) {
+      clonedNode.children = source.children.map(child => {
+        const clonedChild = cloneNodeData(child, clonedNode);
+        stack.push([child, clonedChild]);
+        return clonedChild;
+      });
+    }
+  }
+  
+  return clonedRoot;
+}
+
+/**
+ * Deep-copy a single node's own fields, without its parent or children.
+ * 
+ * @param node Node to copy
+ * @param parent Optional parent for the copy
+ * @returns Copy of the node without children
+ */
+function cloneNodeData(node: AstNode, parent?: AstNode): AstNode {
   // Use structuredClone for a deep copy without circular references
   const clonedNode = structuredClone({ ...node, parent: undefined, children: undefined });
   
@@ -207,11 +357,6 @@ export function cloneNode(node: AstNode, parent?: AstNode): AstNode {
     clonedNode.parent = parent;
   }
   
-  // Clone children if they exist
-  if (node.children) {
-    clonedNode.children = node.children.map(child => cloneNode(child, clonedNode));
-  }
-  
   return clonedNode;
 }
 
@@ -0,0 +1,88 @@
+import { expect, describe, it } from 'vitest';
+import {
+  createElement,
+  createTextNode,
+  findElementsByClassName,
+  getElementById,
+  hasClass,
+  indexElementsById
+} from '../src/index.js';
+
+describe('AST Utilities', () => {
+  describe('hasClass', () => {
+    const element = createElement('div', { class: 'intro content-main\tlead  last' });
+    
+    it('should match whole class tokens at the start, middle and end', () => {
+      expect(hasClass(element, 'intro')).toBe(true);
+      expect(hasClass(element, 'content-main')).toBe(true);
+      expect(hasClass(element, 'last')).toBe(true);
+    });
+    
+    it('should treat tabs and repeated spaces as separators', () => {
+      expect(hasClass(element, 'lead')).toBe(true);
+    });
+    
+    it('should not match a substring of a class token', () => {
+      expect(hasClass(element, 'content')).toBe(false);
+      expect(hasClass(element, 'main')).toBe(false);
+      expect(hasClass(element, 'las')).toBe(false);
+    });
+    
+    it('should not match class names containing whitespace', () => {
+      expect(hasClass(element, 'intro content-main')).toBe(false);
+      expect(hasClass(element, 'lead last')).toBe(false);
+    });
+    
+    it('should not match an empty class name or a missing class attribute', () => {
+      expect(hasClass(element, '')).toBe(false);
+      expect(hasClass(createElement('div'), 'intro')).toBe(false);
+    });
+  });
+  
+  describe('indexElementsById', () => {
+    const first = createElement('section', { id: 'intro' });
+    const nested = createElement('p', { id: 'intro' });
+    const empty = createElement('span', { id: '' });
+    const tree = createElement('div', { id: 'root' }, [
+      createElement('div', {}, [nested]),
+      first,
+      empty,
+      createElement('p', { class: 'no-id' })
+    ]);
+    
+    it('should index every element with an ID', () => {
+      const index = indexElementsById(tree);
+      
+      expect([...index.keys()].sort()).toEqual(['', 'intro', 'root']);
+      expect(index.get('root')).toBe(tree);
+    });
+    
+    it('should keep the first element in document order for duplicate IDs', () => {
+      const index = indexElementsById(tree);
+      
+      expect(index.get('intro')).toBe(nested);
+      expect(index.get('intro')).toBe(getElementById(tree, 'intro'));
+    });
+    
+    it('should index empty IDs like getElementById finds them', () => {
+      const index = indexElementsById(tree);
+      
+      expect(index.get('')).toBe(empty);
+      expect(index.get('')).toBe(getElementById(tree, ''));
+    });
+  });
+  
+  describe('findElementsByClassName', () => {
+    it('should find elements having the class as a whole token', () => {
+      const tree = createElement('div', {}, [
+        createElement('p', { class: 'content' }, [createTextNode('A')]),
+        createElement('p', { class: 'content-main' }, [createTextNode('B')]),
+        createElement('p', { class: 'note content' }, [createTextNode('C')])
+      ]);
+      
+      const found = findElementsByClassName(tree, 'content');
+      
+      expect(found.map(element => element.attributes.class)).toEqual(['content', 'note content']);
+    });
+  });
+});
@@ -1,5 +1,5 @@
 import { expect, describe, it, beforeEach, afterEach } from 'vitest';
-import { HtmlAstTransform, MemoryStorage, FileStorage, RemoveCommentsOperation } from '../src/index.js';
+import { HtmlAstTransform, MemoryStorage, FileStorage, RemoveCommentsOperation, findNodes } from '../src/index.js';
 import { mkdtemp, rm } from 'node:fs/promises';
 import { tmpdir } from 'node:os';
 import { join } from 'node:path';
@@ -54,6 +54,34 @@ describe('HtmlAstTransform', () => {
       expect(commentNode?.type).toBe('comment');
       expect(commentNode?.value).toBe(' This is a comment ');
     });
+    
+    it('should leave out subtrees listed in skipElements', async () => {
+      const html = '<div><SCRIPT>alert(1);</SCRIPT><style>p {}</style><p>Kept</p></div>';
+      const { ast } = await transformer.parse(html, { skipElements: ['script', 'STYLE'] });
+      
+      const output = transformer.toHtml(ast);
+      expect(output).not.toContain('<script');
+      expect(output).not.toContain('<style');
+      expect(output).toContain('<p>Kept</p>');
+    });
+    
+    it('should only add source positions when requested', async () => {
+      const html = '<div><!-- Note --><p>Text</p></div>';
+      
+      // Without positions, nodes carry no sourcePosition key at all
+      const { ast } = await transformer.parse(html);
+      const nodes = findNodes(ast, node => node.type !== 'document');
+      
+      expect(nodes.length).toBeGreaterThan(0);
+      expect(nodes.some(node => 'sourcePosition' in node)).toBe(false);
+      
+      // With positions, every node has the field
+      const { ast: positionedAst } = await transformer.parse(html, { includePositions: true });
+      const positionedNodes = findNodes(positionedAst, node => node.type !== 'document');
+      
+      expect(positionedNodes.every(node => 'sourcePosition' in node)).toBe(true);
+      expect(positionedNodes.find(node => node.name === 'p')?.sourcePosition).toBeDefined();
+    });
   });
   
   describe('Transforming AST', () => {
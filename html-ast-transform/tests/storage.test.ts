@@ -1,6 +1,6 @@
 import { expect, describe, it, beforeEach, afterEach } from 'vitest';
 import { MemoryStorage, FileStorage } from '../src/index.js';
-import { mkdtemp, rm } from 'node:fs/promises';
+import { mkdtemp, rm, writeFile } from 'node:fs/promises';
 import { tmpdir } from 'node:os';
 import { join } from 'node:path';
 
@@ -69,6 +69,31 @@ describe('Storage Implementations', () => {
       expect(retrieved?.children?.[0]?.parent).toBe(retrieved);
     });
     
+    it('should keep attributes named parent and leave the source AST intact', async () => {
+      const node: any = {
+        type: 'element',
+        name: 'div',
+        attributes: { parent: 'nav' },
+        children: []
+      };
+      
+      const childNode: any = {
+        type: 'text',
+        value: 'Hello World',
+        parent: node
+      };
+      
+      node.children.push(childNode);
+      
+      await memoryStorage.store('parent-attribute-test', node);
+      const retrieved = await memoryStorage.retrieve('parent-attribute-test');
+      
+      expect(retrieved?.attributes?.parent).toBe('nav');
+      
+      // Storing must not strip the caller's parent references
+      expect(childNode.parent).toBe(node);
+    });
+    
     it('should handle compressed storage', async () => {
       const compressedStorage = new MemoryStorage({ compressed: true });
       
@@ -283,6 +308,35 @@ describe('Storage Implementations', () => {
       expect(deletedAgain).toBe(false);
     });
     
+    it('should recreate the directory if it is removed between stores', async () => {
+      const node = { type: 'element', name: 'div' };
+      
+      await fileStorage.store('first', node);
+      
+      // The directory was created and cached by the first store
+      await rm(tempDir, { recursive: true });
+      
+      await fileStorage.store('second', node);
+      expect(await fileStorage.retrieve('second')).toEqual(node);
+    });
+    
+    it('should retry creating the directory after a failed attempt', async () => {
+      const node = { type: 'element', name: 'div' };
+      
+      // A file where the parent directory should be makes mkdir fail
+      const blockedPath = join(tempDir, 'blocked');
+      await writeFile(blockedPath, '');
+      const blockedStorage = new FileStorage(join(blockedPath, 'asts'));
+      
+      await expect(blockedStorage.store('test-id', node)).rejects.toThrow();
+      
+      // Once the obstacle is gone, the next call creates the directory
+      await rm(blockedPath);
+      
+      await blockedStorage.store('test-id', node);
+      expect(await blockedStorage.retrieve('test-id')).toEqual(node);
+    });
+    
     it('should handle special characters in ID', async () => {
       const node = { type: 'element', name: 'div' };
       const specialId = 'test/file:with?special<chars>';
@@ -5,7 +5,11 @@ import {
   RemoveCommentsOperation,
   RemoveElementsOperation,
   CollapseWhitespaceOperation,
-  RemoveAttributesOperation
+  RemoveAttributesOperation,
+  SanitizeHtmlOperation,
+  AddHeadingIdsOperation,
+  WrapElementsOperation,
+  UnwrapElementsOperation
 } from '../src/index.js';
 
 describe('Transformer Operations', () => {
@@ -178,6 +182,124 @@ describe('Transformer Operations', () => {
     });
   });
   
+  describe('SanitizeHtmlOperation', () => {
+    it('should match custom unsafe attributes case-insensitively', () => {
+      const operation = new SanitizeHtmlOperation({
+        unsafeElements: ['MARQUEE'],
+        unsafeAttributes: ['data-Unsafe']
+      });
+      const context = { path: [], data: {} };
+      
+      const element = {
+        type: 'element',
+        name: 'div',
+        attributes: { 'data-unsafe': 'x', onclick: 'y', title: 'kept' },
+        children: []
+      };
+      
+      const sanitized = operation.transform(element, context);
+      expect(sanitized?.attributes).toEqual({ title: 'kept' });
+      
+      const marquee = { type: 'element', name: 'marquee', attributes: {}, children: [] };
+      expect(operation.transform(marquee, context)).toBeNull();
+    });
+  });
+  
+  describe('AddHeadingIdsOperation', () => {
+    it('should suffix repeated heading IDs without reusing taken ones', () => {
+      const operation = new AddHeadingIdsOperation();
+      const context = { path: [], data: {} };
+      const heading = (text: string) => ({
+        type: 'element',
+        name: 'h2',
+        attributes: {},
+        children: [{ type: 'text', value: text }]
+      });
+      
+      const ids = ['Intro', 'Intro', 'Intro 1', 'Intro', 'Intro'].map(
+        text => operation.transform(heading(text), context)?.attributes?.id
+      );
+      
+      expect(ids).toEqual([
+        'heading-intro',
+        'heading-intro-1',
+        'heading-intro-1-1',
+        'heading-intro-2',
+        'heading-intro-3'
+      ]);
+    });
+  });
+  
+  describe('WrapElementsOperation', () => {
+    it('should wrap each matching element exactly once', async () => {
+      const html = '<div><img src="a.png"><img src="b.png"></div>';
+      
+      const { ast } = await transformer.parse(html);
+      
+      transformer.addTransformation(
+        new WrapElementsOperation('figure', (node) => node.name === 'img', { class: 'image' })
+      );
+      
+      const { ast: transformedAst } = await transformer.transform(ast);
+      
+      expect(transformer.toHtml(transformedAst)).toContain(
+        '<div><figure class="image"><img src="a.png"></figure><figure class="image"><img src="b.png"></figure></div>'
+      );
+    });
+  });
+  
+  describe('UnwrapElementsOperation', () => {
+    it('should replace elements with all of their children', async () => {
+      const html = '<div><span>One <b>two</b> and <span>three</span></span><span></span><p>four</p></div>';
+      
+      const { ast } = await transformer.parse(html);
+      
+      transformer.addTransformation(
+        new UnwrapElementsOperation((node) => node.name === 'span')
+      );
+      
+      const { ast: transformedAst } = await transformer.transform(ast);
+      
+      expect(transformer.toHtml(transformedAst)).toContain(
+        '<div>One <b>two</b> and three<p>four</p></div>'
+      );
+    });
+    
+    it('should leave the root and childless nodes as they are', () => {
+      const operation = new UnwrapElementsOperation((node) => node.name === 'span');
+      const context = { path: [], data: {} };
+      
+      const text = { type: 'text', value: 'Text' };
+      expect(operation.transform(text, context)).toBe(text);
+      
+      // Unwrapping happens at the parent, so a selected root is kept
+      const root = {
+        type: 'element',
+        name: 'span',
+        attributes: {},
+        children: [{ type: 'text', value: 'Root' }]
+      };
+      expect(operation.transform(root, context)).toBe(root);
+    });
+  });
+  
+  describe('AstTransformer', () => {
+    it('should apply operations passed to the constructor', async () => {
+      const { ast } = await transformer.parse('<div><script>alert(1)</script><img src="a.png"></div>');
+      
+      const astTransformer = new AstTransformer([
+        new RemoveElementsOperation(['script']),
+        new WrapElementsOperation('figure', (node) => node.name === 'img')
+      ]);
+      
+      const { ast: transformedAst } = await astTransformer.transform(ast);
+      
+      expect(transformer.toHtml(transformedAst)).toContain(
+        '<div><figure><img src="a.png"></figure></div>'
+      );
+    });
+  });
+  
   describe('Chaining transformations', () => {
     it('should apply multiple transformations in order', async () => {
       const html = `